@@ -5,10 +5,24 @@ import argparse
 import sys
 import re
 import csv
+import hashlib
 import logging
+import threading
+import time
+import traceback
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path # Use pathlib for better path handling
-from neo4j import GraphDatabase, basic_auth, exceptions as neo4j_exceptions
-import shutil # Added for file copying
+from neo4j import WRITE_ACCESS, Bookmarks, GraphDatabase, basic_auth, exceptions as neo4j_exceptions
+import shutil # Used to clear the export directory before joern-export
+try:
+    # Optional: much faster CSV parsing for the data files (pip install "joern[arrow]")
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
 # --- Configuration ---
 # Set up basic logging
 logging.basicConfig(
@@ -18,40 +32,109 @@ logging.basicConfig(
 
 # Default JVM memory allocation for Joern commands (adjust as needed)
 DEFAULT_JVM_MEM = "-J-Xmx4G"
-# Batch size for IN TRANSACTIONS clause
-BATCH_SIZE = 1000
+# Number of trailing output lines kept from external commands for error reporting
+OUTPUT_TAIL_LINES = 200
+# Data files are parsed client-side, so lift the csv module's 128 KB field limit like LOAD CSV
+# (CONFIG_FILE.CONTENT holds whole files); clamped to what a C long holds on every platform
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+# Number of data rows sent per UNWIND batch (one write transaction per batch)
+DEFAULT_BATCH_SIZE = 20000
+# Block size used by pyarrow when streaming data files (bounds memory per reader)
+ARROW_BLOCK_SIZE = 16 << 20
+# Number of cypher files imported concurrently (one Neo4j session per worker)
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+# Time budget for the driver's automatic retries of a managed transaction
+MAX_TRANSACTION_RETRY_TIME_SECONDS = 60
+# Time a worker waits for a pooled connection before failing
+CONNECTION_ACQUISITION_TIMEOUT_SECONDS = 120
+# Retries per batch on transient errors (e.g. deadlocks between concurrent edge imports)
+DEFAULT_MAX_RETRIES = 5
+# Maximum time to wait for indexes to come online after constraint creation
+INDEX_AWAIT_TIMEOUT_SECONDS = 300
+
+# Regex to match the leading LOAD CSV clause and extract components
+# Handles optional "WITH HEADERS" and captures the base file path and variable name
+# Made more robust to handle potential variations in spacing
+pattern_load_csv = re.compile(
+    r"\s*(LOAD\s+CSV(?:\s+WITH\s+HEADERS)?\s+FROM\s+)'file:/([^']+)'(\s+AS\s+(\w+))",
+    re.IGNORECASE
+)
+# Import markers record the hash of each successfully imported data file, keyed by file name
+IMPORT_MARKER_READ_QUERY = "MATCH (m:JoernImportMarker {file: $file}) RETURN m.hash AS hash"
+IMPORT_MARKER_WRITE_QUERY = "MERGE (m:JoernImportMarker {file: $file}) SET m.hash = $hash, m.ts = timestamp()"
+IMPORT_MARKER_DELETE_QUERY = "MATCH (m:JoernImportMarker {file: $file}) DELETE m"
+EDGE_IMPORT_MARKERS_DELETE_QUERY = "MATCH (m:JoernImportMarker) WHERE m.file STARTS WITH 'edges_' DELETE m"
+# Read size used when hashing data files
+HASH_CHUNK_SIZE = 1 << 20
+# Shared label added to every imported node, so edge queries can look endpoints up by indexed id
+SHARED_NODE_LABEL = "JoernNode"
+JOERN_NODE_CONSTRAINT_NAME = "JoernNodeIdConstraint"
+
+# Matches the node pattern of a Joern node query (e.g. "CREATE (:METHOD" in "CREATE (:METHOD {")
+pattern_node_create = re.compile(r"(\bCREATE\s*\(\s*\w*\s*:\s*\w+)(?=\s*\{)", re.IGNORECASE)
+# Matches the unlabeled endpoint pattern of a Joern edge query (e.g. "MATCH (a), (b)")
+pattern_edge_match = re.compile(r"\bMATCH\s*\(\s*(\w+)\s*\)\s*,\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+# Match what a transformed query creates (e.g. "CREATE (:METHOD:JoernNode {" or "CREATE (a)-[r:AST {"),
+# so that the rows of an earlier import of the same file can be found and deleted
+pattern_created_node_label = re.compile(rf"\bCREATE\s*\(\s*\w*\s*:\s*(\w+)\s*:\s*{SHARED_NODE_LABEL}\b", re.IGNORECASE)
+pattern_created_relationship_type = re.compile(r"\bCREATE\s*\(\s*\w+\s*\)\s*-\s*\[\s*\w*\s*:\s*(\w+)", re.IGNORECASE)
 
 # --- Helper Functions ---
 
+class LoadCsvClauseNotFoundError(Exception):
+    """Raised when a Joern cypher file does not start with the expected LOAD CSV clause."""
+
+def _drain_stream(stream, log_level, tail):
+    """Logs each line of a process output stream as it arrives, keeping the last lines in tail."""
+    for line in stream:
+        line = line.rstrip()
+        if line:
+            logging.log(log_level, line)
+            tail.append(line)
+    stream.close()
+
 def run_command(command, cwd=None):
-    """Executes a shell command and logs output."""
+    """
+    Executes a shell command and logs its output.
+
+    stdout/stderr are streamed to the log line by line while the command runs, instead of
+    being buffered in memory until exit; only the last OUTPUT_TAIL_LINES lines of each
+    stream are kept for the return value and error reporting.
+    """
     logging.info(f"Running command: {' '.join(command)}")
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             command,
-            check=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=1, # Line buffered
             text=True,
             encoding='utf-8', # Explicitly set encoding
             errors='replace', # Handle potential encoding errors in output
             cwd=cwd
         )
-        # Log stdout only if it contains content, to avoid clutter
-        if result.stdout and result.stdout.strip():
-            logging.info(f"Command stdout:\n{result.stdout}")
-        # Log stderr as warning only if it contains content
-        if result.stderr and result.stderr.strip():
-            logging.warning(f"Command stderr:\n{result.stderr}")
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Command failed: {' '.join(e.cmd)}")
-        logging.error(f"Return code: {e.returncode}")
-        # Decode stderr/stdout safely if they exist
-        stderr_output = e.stderr.strip() if e.stderr else "N/A"
-        stdout_output = e.stdout.strip() if e.stdout else "N/A"
-        logging.error(f"Stderr: {stderr_output}")
-        logging.error(f"Stdout: {stdout_output}")
-        return False, stderr_output
+        stdout_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        stderr_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        # Log stdout as info and stderr as warning
+        readers = [
+            threading.Thread(target=_drain_stream, args=(process.stdout, logging.INFO, stdout_tail), daemon=True),
+            threading.Thread(target=_drain_stream, args=(process.stderr, logging.WARNING, stderr_tail), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        returncode = process.wait()
+        for reader in readers:
+            reader.join()
+
+        if returncode != 0:
+            logging.error(f"Command failed: {' '.join(command)}")
+            logging.error(f"Return code: {returncode}")
+            stderr_output = "\n".join(stderr_tail) or "N/A"
+            stdout_output = "\n".join(stdout_tail) or "N/A"
+            logging.error(f"Stderr (last {OUTPUT_TAIL_LINES} lines): {stderr_output}")
+            logging.error(f"Stdout (last {OUTPUT_TAIL_LINES} lines): {stdout_output}")
+            return False, stderr_output
+        return True, "\n".join(stdout_tail)
     except FileNotFoundError:
         logging.error(f"Error: Command not found: {command}. Is it installed and in PATH?")
         return False, f"Command not found: {command}"
@@ -92,6 +175,157 @@ def run_joern_export(cpg_input_path, csv_output_dir, export_format="neo4jcsv", j
         logging.error("Joern export failed.")
         return None
 
+def read_small_file(file_path: Path) -> bytes:
+    """
+    Reads a whole file with raw os.open/os.read calls, bypassing Python's buffered IO layer.
+
+    Intended for the many small *_cypher.csv files, where open()/TextIOWrapper setup costs
+    more than the read itself.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk: # File shrank while reading
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+def compute_import_hash(data_file_path: Path, query: str) -> str:
+    """
+    Computes the content hash recorded in a file's import marker.
+
+    Covers the full data file plus the query that imports it, so a change to either
+    triggers a re-import.
+    """
+    hasher = hashlib.blake2b(digest_size=32)
+    hasher.update(query.encode('utf-8'))
+    with data_file_path.open("rb") as data_file:
+        while chunk := data_file.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def read_data_batches(data_file_path: Path, batch_size: int, with_headers: bool = False):
+    """
+    Streams a Joern _data.csv file and yields its rows in batches.
+
+    Empty fields are converted to None to match LOAD CSV semantics, so that
+    properties without a value are not set on the imported nodes/relationships.
+    Uses pyarrow's C++ CSV parser when pyarrow is installed, and the csv module otherwise.
+
+    Args:
+        data_file_path: Path to the _data.csv file.
+        batch_size: Maximum number of rows per yielded batch.
+        with_headers: If True, the first line is a header and rows are yielded as
+                      dicts (LOAD CSV WITH HEADERS); otherwise rows are lists.
+
+    Yields:
+        Lists of rows, each row being a list (or dict) of field values.
+    """
+    if pacsv is not None:
+        yield from _read_data_batches_arrow(data_file_path, batch_size, with_headers)
+    else:
+        yield from _read_data_batches_csv(data_file_path, batch_size, with_headers)
+
+def _read_data_batches_csv(data_file_path: Path, batch_size: int, with_headers: bool):
+    """read_data_batches implementation using the pure-Python csv module."""
+    with data_file_path.open("r", encoding="utf-8", newline="") as data_file:
+        batch = []
+        if with_headers:
+            for record in csv.DictReader(data_file):
+                batch.append({key: value if value != "" else None for key, value in record.items()})
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        else:
+            for record in csv.reader(data_file):
+                batch.append([value if value != "" else None for value in record])
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+def _read_data_batches_arrow(data_file_path: Path, batch_size: int, with_headers: bool):
+    """read_data_batches implementation using pyarrow.csv."""
+    # Every column is read as a string, exactly like LOAD CSV; the Cypher query does the
+    # conversions (toInteger, toBoolean, ...). The column names (generated, or read from the
+    # header) are taken from pyarrow's own parse of the first block, so that all columns can
+    # be typed up front.
+    if data_file_path.stat().st_size == 0:
+        return
+    parse_options = pacsv.ParseOptions(newlines_in_values=True) # CODE properties span lines
+    probe_options = pacsv.ReadOptions(block_size=ARROW_BLOCK_SIZE, autogenerate_column_names=not with_headers)
+    with pacsv.open_csv(data_file_path, read_options=probe_options, parse_options=parse_options) as probe:
+        column_names = probe.schema.names
+
+    if with_headers:
+        read_options = pacsv.ReadOptions(block_size=ARROW_BLOCK_SIZE)
+    else:
+        read_options = pacsv.ReadOptions(block_size=ARROW_BLOCK_SIZE, column_names=column_names)
+    # open_csv parses one block at a time, so memory stays bounded by the block and batch sizes
+    with pacsv.open_csv(
+        data_file_path,
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in column_names},
+            null_values=[""],
+            strings_can_be_null=True
+        )
+    ) as reader:
+        batch = []
+        while True:
+            try:
+                record_batch = reader.read_next_batch()
+            except StopIteration:
+                break
+            if with_headers:
+                batch.extend(record_batch.to_pylist())
+            else:
+                batch.extend(list(row) for row in zip(*(column.to_pylist() for column in record_batch.columns)))
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                del batch[:batch_size]
+        if batch:
+            yield batch
+
+def execute_batch(session, query: str, rows: list, max_retries: int = DEFAULT_MAX_RETRIES):
+    """
+    Executes a parameterized UNWIND query for one batch of rows in a write transaction.
+
+    execute_write already retries transient errors (deadlocks, lock timeouts) within the
+    driver's max_transaction_retry_time; if a batch still fails after that, it is retried
+    here with exponential backoff, which is expected when several workers create
+    relationships on the same dense nodes.
+
+    Args:
+        session: The Neo4j session to use.
+        query: The UNWIND query taking a $rows parameter.
+        rows: The batch of rows.
+        max_retries: Maximum number of retries before the error is raised.
+
+    Returns:
+        The result summary of the executed query.
+    """
+    attempt = 0
+    while True:
+        try:
+            return session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        except neo4j_exceptions.TransientError as e:
+            if attempt >= max_retries:
+                raise
+            delay = 0.5 * (2 ** attempt)
+            attempt += 1
+            logging.warning(f"Transient error ({e.code}), retrying batch in {delay:.1f}s (attempt {attempt}/{max_retries})")
+            time.sleep(delay)
+
 def get_cypher_files(output_dir: Path) -> tuple[list[Path], list[Path]]:
     """
     Finds node and edge Cypher import files (*_cypher.csv) in the specified directory.
@@ -112,9 +346,20 @@ def get_cypher_files(output_dir: Path) -> tuple[list[Path], list[Path]]:
         raise FileNotFoundError(f"Output directory not found: {output_dir}")
 
     logging.info(f"Searching for Neo4j Cypher import files (*_cypher.csv) in: {output_dir}")
-    node_cypher_files = sorted(list(output_dir.glob("nodes_*_cypher.csv")))
-    # Using edges_ prefix as per user's code
-    edge_cypher_files = sorted(list(output_dir.glob("edges_*_cypher.csv")))
+    # Single directory pass, bucketing files by prefix (edges_ prefix as per user's code)
+    node_cypher_files = []
+    edge_cypher_files = []
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not (name.endswith("_cypher.csv") and entry.is_file()):
+                continue
+            if name.startswith("nodes_"):
+                node_cypher_files.append(Path(entry.path))
+            elif name.startswith("edges_"):
+                edge_cypher_files.append(Path(entry.path))
+    node_cypher_files.sort()
+    edge_cypher_files.sort()
 
     logging.info(f"Found {len(node_cypher_files)} node cypher files.")
     logging.info(f"Found {len(edge_cypher_files)} edge cypher files.")
@@ -125,12 +370,310 @@ def get_cypher_files(output_dir: Path) -> tuple[list[Path], list[Path]]:
     return node_cypher_files, edge_cypher_files
 
 
+@lru_cache(maxsize=64)
+def _var_ref_pattern(variable_name: str) -> re.Pattern:
+    """Compiled pattern matching references to a LOAD CSV variable (e.g. 'line' in line[0] or line.id)."""
+    return re.compile(rf"\b{re.escape(variable_name)}(?=\s*[\[.])")
+
+def transform_cypher(cypher_content: str) -> tuple[str, bool, str | None]:
+    """
+    Converts a Joern LOAD CSV query into a parameterized UNWIND query.
+
+    The LOAD CSV clause is matched once, anchored at the start of the query; the core
+    logic that follows it is rewritten to read from the UNWIND variable 'row'. Node
+    queries additionally tag created nodes with the shared JoernNode label, and edge
+    queries match their endpoints through it.
+
+    Args:
+        cypher_content: The content of a *_cypher.csv file.
+
+    Returns:
+        A tuple (relative_data_filename, with_headers, unwind_cypher), where
+        unwind_cypher is None if there is no logic after the LOAD CSV clause.
+
+    Raises:
+        LoadCsvClauseNotFoundError: If the query does not start with a LOAD CSV FROM 'file:/...' clause.
+    """
+    match = pattern_load_csv.match(cypher_content)
+    if not match:
+        raise LoadCsvClauseNotFoundError("LOAD CSV clause not found")
+
+    with_headers = "HEADERS" in match.group(1).upper() # "LOAD CSV [WITH HEADERS] FROM"
+    relative_data_filename = match.group(2) # "<filename>_data.csv"
+    variable_name = match.group(4) # "<variable>" (e.g., 'line')
+
+    # Core logic is everything after the LOAD CSV clause, without the terminating semicolon.
+    # Only a single trailing ';' is a statement terminator; anything else is left untouched.
+    core_logic = cypher_content[match.end(0):].strip()
+    if core_logic.endswith(";"):
+        core_logic = core_logic[:-1].rstrip()
+    if not core_logic:
+        return relative_data_filename, with_headers, None
+
+    # Replace references to the LOAD CSV variable (e.g. line[0]) with the UNWIND variable
+    row_logic = _var_ref_pattern(variable_name).sub("row", core_logic)
+
+    # Tag created nodes with the shared label, and match edge endpoints through it,
+    # so every endpoint lookup can use the JoernNode.id constraint's index
+    row_logic = pattern_node_create.sub(rf"\1:{SHARED_NODE_LABEL}", row_logic, count=1)
+    row_logic = pattern_edge_match.sub(
+        rf"MATCH (\1:{SHARED_NODE_LABEL}), (\2:{SHARED_NODE_LABEL})", row_logic, count=1
+    )
+    return relative_data_filename, with_headers, f"UNWIND $rows AS row\n{row_logic}"
+
+def prepare_cypher_file(cypher_file_path: Path) -> tuple[str, bool, str | None] | None:
+    """
+    Reads a cypher file and converts its query with transform_cypher.
+
+    Does not touch Neo4j, so it can run in a worker process while the driver connects
+    and earlier files are being imported.
+
+    Args:
+        cypher_file_path: Path to the *_cypher.csv file.
+
+    Returns:
+        The transform_cypher result, or None if the file is empty.
+
+    Raises:
+        OSError: If the file cannot be read.
+        UnicodeDecodeError: If the file is not valid UTF-8.
+        LoadCsvClauseNotFoundError: If the query has no LOAD CSV clause.
+    """
+    cypher_content = read_small_file(cypher_file_path).decode('utf-8')
+    if not cypher_content.strip():
+        return None
+    return transform_cypher(cypher_content)
+
+def delete_previous_import(session, data_file_name: str, unwind_cypher: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Deletes what an earlier, possibly partial, import of a cypher file created.
+
+    Node queries are plain CREATEs, so re-importing a node file over its old nodes would
+    violate the JoernNode.id constraint, and re-importing an edge file would duplicate its
+    relationships. The file's marker is dropped first, so an interrupted cleanup is redone
+    on the next run. Deleting nodes also deletes their relationships, so a node file drops
+    every edge marker as well, and the edge files are re-imported in the edge phase.
+
+    Args:
+        session: The Neo4j session to use.
+        data_file_name: File name of the _data.csv file, as recorded in its import marker.
+        unwind_cypher: The transformed query of the cypher file.
+        batch_size: Maximum number of nodes or relationships deleted per write transaction.
+
+    Returns:
+        The number of nodes or relationships deleted.
+    """
+    node_label_match = pattern_created_node_label.search(unwind_cypher)
+    relationship_type_match = pattern_created_relationship_type.search(unwind_cypher)
+    if node_label_match:
+        delete_query = (
+            f"MATCH (n:{node_label_match.group(1)}:{SHARED_NODE_LABEL}) "
+            "WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS deleted"
+        )
+        session.execute_write(lambda tx: tx.run(EDGE_IMPORT_MARKERS_DELETE_QUERY).consume())
+    elif relationship_type_match:
+        delete_query = (
+            f"MATCH ()-[r:{relationship_type_match.group(1)}]->() "
+            "WITH r LIMIT $limit DELETE r RETURN count(*) AS deleted"
+        )
+    else:
+        logging.warning(f"Could not tell what {data_file_name} creates; rows of an earlier import are not deleted.")
+        return 0
+    session.execute_write(lambda tx: tx.run(IMPORT_MARKER_DELETE_QUERY, file=data_file_name).consume())
+
+    deleted_total = 0
+    while True:
+        deleted = session.execute_write(lambda tx: tx.run(delete_query, limit=batch_size).single()["deleted"])
+        if deleted == 0:
+            return deleted_total
+        deleted_total += deleted
+
+def import_cypher_file(
+    session, cypher_file_path: Path, max_retries: int = DEFAULT_MAX_RETRIES, prepared_query=None, force: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE
+):
+    """
+    Imports a single Joern cypher file and its _data.csv into Neo4j.
+
+    Runs on a worker thread, using that worker's session (sessions are not thread-safe).
+
+    Args:
+        session: The Neo4j session owned by the calling worker thread.
+        cypher_file_path: Path to the *_cypher.csv file.
+        max_retries: Maximum number of retries per batch on transient errors.
+        prepared_query: Future of prepare_cypher_file for this file, or None to prepare it here.
+        force: If True, import the file even if its import marker shows it is unchanged.
+        batch_size: Number of data rows per UNWIND write transaction.
+
+    Returns:
+        True if the file was imported (or is already up to date), None if it was skipped (empty),
+        False on error.
+    """
+    logging.info(f"--- Processing Cypher File: {cypher_file_path.name} ---")
+    try:
+        # 1. Read the Cypher query and convert LOAD CSV into a parameterized UNWIND query
+        #    (normally already done ahead of time in a worker process, see prepare_cypher_file)
+        try:
+            if prepared_query is not None:
+                prepared = prepared_query.result()
+            else:
+                prepared = prepare_cypher_file(cypher_file_path)
+        except UnicodeDecodeError as e:
+            logging.error(f"Cypher file is not valid UTF-8, skipping: {cypher_file_path.name} ({e})")
+            return False
+        except LoadCsvClauseNotFoundError:
+            logging.error(f"Could not find 'LOAD CSV FROM 'file:/...'' pattern in {cypher_file_path.name}. Cannot modify for import. Skipping file.")
+            logging.error("Expected format: LOAD CSV FROM 'file:/<filename>_data.csv' AS <variable>")
+            return False
+
+        if prepared is None:
+            logging.warning(f"Cypher file is empty, skipping: {cypher_file_path.name}")
+            return None
+        relative_data_filename, with_headers, unwind_cypher = prepared
+
+        if unwind_cypher is None:
+            logging.warning(f"No core Cypher logic found after LOAD CSV clause in {cypher_file_path.name}. Skipping execution.")
+            return None
+
+        # 3. Construct absolute path for the corresponding _data.csv file
+        # Ensure the data file is looked for in the same directory as the cypher file
+        data_file_path = cypher_file_path.parent.resolve() / Path(relative_data_filename).name
+        if not data_file_path.is_file():
+            logging.error(f"Corresponding data file not found for {cypher_file_path.name}: {data_file_path}")
+            logging.error("Ensure the '_data.csv' file exists in the same directory as the '_cypher.csv' file.")
+            return False
+
+        # log.debug(f"UNWIND Cypher for {cypher_file_path.name}:\n{unwind_cypher}") # Uncomment for debugging
+
+        # 4. Skip files whose data and query are unchanged since their last successful import
+        import_hash = compute_import_hash(data_file_path, unwind_cypher)
+        if not force:
+            previous_hash = session.execute_read(
+                lambda tx: tx.run(IMPORT_MARKER_READ_QUERY, file=data_file_path.name).single()
+            )
+            if previous_hash is not None and previous_hash["hash"] == import_hash:
+                logging.info(f"{data_file_path.name} is unchanged since its last import, skipping (use --force to re-import).")
+                return True
+
+        # 5. The file is new, changed or forced: remove the rows an earlier import left behind
+        deleted = delete_previous_import(session, data_file_path.name, unwind_cypher, batch_size)
+        if deleted:
+            logging.info(f"Deleted {deleted} nodes/relationships from an earlier import of {data_file_path.name}.")
+
+        # 6. Stream the data file in batches and execute each batch in a managed write transaction
+        logging.info(f"Executing UNWIND Cypher from: {cypher_file_path.name} with data from {data_file_path.name}")
+        rows_processed = 0
+        nodes_created = 0
+        relationships_created = 0
+        for batch in read_data_batches(data_file_path, batch_size, with_headers):
+            summary = execute_batch(session, unwind_cypher, batch, max_retries)
+            rows_processed += len(batch)
+            nodes_created += summary.counters.nodes_created
+            relationships_created += summary.counters.relationships_created
+        logging.info(
+            f"Successfully imported {rows_processed} rows from {data_file_path.name}. "
+            f"Nodes created: {nodes_created}, relationships created: {relationships_created}"
+        )
+
+        # 7. Record the import, so an unchanged file is skipped on the next run
+        session.execute_write(
+            lambda tx: tx.run(IMPORT_MARKER_WRITE_QUERY, file=data_file_path.name, hash=import_hash).consume()
+        )
+        return True
+
+    except FileNotFoundError:
+        logging.error(f"Cypher file not found during processing loop: {cypher_file_path}. This should not happen if discovery worked.")
+        return False
+    except neo4j_exceptions.ClientError as e:
+        logging.error(f"Neo4j ClientError during import of {cypher_file_path.name}: {e.code} - {e.message}")
+        if "constraint" in str(e.message).lower():
+            logging.error("Hint: Check for data violating uniqueness constraints.")
+        elif "apoc" in str(e.message).lower():
+            logging.error("Hint: Ensure APOC plugin is installed and configured in Neo4j if the Cypher query uses APOC procedures.")
+        elif "transaction" in str(e.message).lower():
+            logging.error("Hint: The error occurred during transaction processing, potentially related to batching or query complexity.")
+        return False
+    except csv.Error as e:
+        logging.error(f"Failed to parse data file for {cypher_file_path.name}: {e}")
+        return False
+    except Exception as e:
+        logging.error(f"An unexpected error occurred processing {cypher_file_path.name}: {type(e).__name__} - {e}")
+        return False
+
+
+def run_import_phase(
+    driver, database_name: str, cypher_files: list[Path], workers: int, max_retries: int, bookmarks=None,
+    prepared_queries: dict | None = None, force: bool = False, batch_size: int = DEFAULT_BATCH_SIZE
+):
+    """
+    Imports a group of independent cypher files concurrently.
+
+    Each worker thread opens one session on first use and reuses it for every file it
+    processes, so session setup is paid once per worker rather than once per file.
+
+    Args:
+        driver: The Neo4j driver instance (thread-safe, shared by all workers).
+        database_name: The name of the target Neo4j database.
+        cypher_files: List of Paths to the cypher files of this phase.
+        workers: Number of worker threads.
+        max_retries: Maximum number of retries per batch on transient errors.
+        bookmarks: Bookmarks the sessions must observe (e.g. from a previous phase), or None.
+        prepared_queries: Optional mapping of cypher file Path to a prepare_cypher_file Future.
+        force: If True, re-import files even if their import markers show them unchanged.
+        batch_size: Number of data rows per UNWIND write transaction.
+
+    Returns:
+        A tuple (processed_files, import_errors, bookmarks), where bookmarks combine the
+        last bookmarks of all sessions used in this phase.
+    """
+    thread_state = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+
+    def import_with_worker_session(cypher_file_path: Path):
+        session = getattr(thread_state, "session", None)
+        if session is None:
+            session = driver.session(
+                database=database_name,
+                bookmarks=bookmarks,
+                default_access_mode=WRITE_ACCESS,
+                # Batches are consumed, never streamed, so keep result fetching minimal
+                fetch_size=1
+            )
+            thread_state.session = session
+            with sessions_lock:
+                sessions.append(session)
+        prepared_query = prepared_queries.get(cypher_file_path) if prepared_queries else None
+        return import_cypher_file(session, cypher_file_path, max_retries, prepared_query, force, batch_size)
+
+    processed_files = 0
+    import_errors = False
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(import_with_worker_session, cypher_file_path) for cypher_file_path in cypher_files]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is True:
+                    processed_files += 1 # Count ONLY successful imports
+                elif result is False:
+                    import_errors = True
+    finally:
+        phase_bookmarks = Bookmarks()
+        for session in sessions:
+            phase_bookmarks += session.last_bookmarks()
+            session.close()
+
+    return processed_files, import_errors, phase_bookmarks
+
 def import_online_neo4j(
-    driver, database_name: str, node_cypher_files: list[Path], edge_cypher_files: list[Path], output_dir: Path
+    driver, database_name: str, node_cypher_files: list[Path], edge_cypher_files: list[Path], output_dir: Path,
+    workers: int = DEFAULT_WORKERS, max_retries: int = DEFAULT_MAX_RETRIES, prepared_queries: dict | None = None,
+    force: bool = False, batch_size: int = DEFAULT_BATCH_SIZE
 ):
     """
-    Imports data into Neo4j by executing pre-written Cypher queries found in files,
-    modifying them for absolute paths and batching.
+    Imports data into Neo4j by executing pre-written Cypher queries found in files.
+    Each query's LOAD CSV clause is replaced by UNWIND over batches of rows read
+    from the corresponding _data.csv file on the client side.
 
     Args:
         driver: The Neo4j driver instance.
@@ -138,148 +681,81 @@ def import_online_neo4j(
         node_cypher_files: List of Paths to node cypher files.
         edge_cypher_files: List of Paths to edge cypher files.
         output_dir: The Path object representing the base directory containing the cypher and data files.
+        workers: Number of files imported concurrently within the node and edge phases.
+        max_retries: Maximum number of retries per batch on transient errors.
+        prepared_queries: Optional mapping of cypher file Path to a Future of its prepare_cypher_file
+                          result, submitted before the import starts so parsing overlaps with it.
+        force: If True, re-import files even if their import markers show them unchanged.
+        batch_size: Number of data rows per UNWIND write transaction.
     """
     logging.info(f"Starting Neo4j online import into database '{database_name}'.")
     logging.warning("-" * 80)
 
 
-    # Regex to find LOAD CSV and extract components
-    # Handles optional "WITH HEADERS" and captures the base file path and variable name
-    # Made more robust to handle potential variations in spacing
-    pattern_load_csv = re.compile(
-        r"(LOAD\s+CSV(?:\s+WITH\s+HEADERS)?\s+FROM\s+)'file:/([^']+)'(\s+AS\s+(\w+))",
-        re.IGNORECASE
-    )
-
     # --- Create Constraints (Attempt) ---
-    # Assuming a common pattern for Joern nodes. Adjust if needed.
-    constraint_query = "CREATE CONSTRAINT JoernNodeIdConstraint IF NOT EXISTS FOR (n:JoernNode) REQUIRE n.id IS UNIQUE"
+    # Every imported node also carries the shared JoernNode label (see transform_cypher), and the
+    # edge queries match their endpoints as (a:JoernNode), (b:JoernNode). A uniqueness constraint
+    # on JoernNode.id therefore turns each edge endpoint lookup into an index seek.
     constraint_applied = False
+    bookmarks = None
     try:
-        with driver.session(database=database_name) as session:
-            logging.info(f"Attempting to apply constraint to database '{database_name}': {constraint_query}")
-            session.execute_write(lambda tx: tx.run(constraint_query).consume())
-            logging.info("Constraint check/creation successful or constraint already existed.")
-            constraint_applied = True
+        with driver.session(database=database_name, default_access_mode=WRITE_ACCESS) as session:
+            # Skip schema objects that already exist, so re-runs do not take schema locks needlessly.
+            # A constraint's backing index shares its name, so checking both lists covers either.
+            existing_names = {record["name"] for record in session.run("SHOW CONSTRAINTS YIELD name")}
+            existing_names |= {record["name"] for record in session.run("SHOW INDEXES YIELD name")}
+
+            if JOERN_NODE_CONSTRAINT_NAME in existing_names:
+                logging.info(f"Constraint {JOERN_NODE_CONSTRAINT_NAME} already exists in database '{database_name}'.")
+                constraint_applied = True
+            else:
+                constraint_query = (
+                    f"CREATE CONSTRAINT {JOERN_NODE_CONSTRAINT_NAME} IF NOT EXISTS "
+                    f"FOR (n:{SHARED_NODE_LABEL}) REQUIRE n.id IS UNIQUE"
+                )
+                try:
+                    logging.info(f"Attempting to apply constraint to database '{database_name}': {constraint_query}")
+                    session.execute_write(lambda tx: tx.run(constraint_query).consume())
+                    logging.info("Constraint creation successful.")
+                    constraint_applied = True
+                except neo4j_exceptions.ClientError as e:
+                    logging.error(f"Failed to apply constraint to database '{database_name}': {e.code} - {e.message}")
+                    logging.error(f"Check if 'id' property exists on {SHARED_NODE_LABEL} or if constraint syntax is valid.")
+
+            # Wait for the backing index to come online before any node/edge file is processed
+            if constraint_applied:
+                logging.info("Waiting for indexes to come online...")
+                session.run(f"CALL db.awaitIndexes({INDEX_AWAIT_TIMEOUT_SECONDS})").consume()
+            bookmarks = session.last_bookmarks()
     except neo4j_exceptions.ClientError as e:
-        logging.error(f"Failed to apply constraint to database '{database_name}': {e.code} - {e.message}")
-        logging.error("Check if 'id' property exists on JoernNode or if constraint syntax is valid.")
+        logging.error(f"Failed while checking constraints or waiting for indexes in database '{database_name}': {e.code} - {e.message}")
     except Exception as e:
         logging.error(f"An unexpected error occurred during constraint creation: {type(e).__name__} - {e}")
 
     if not constraint_applied:
-        logging.warning("Constraint application failed or was skipped. Performance might be impacted if queries use MERGE.")
+        logging.warning(f"Constraint application failed or was skipped. Edge imports will scan all {SHARED_NODE_LABEL} nodes for their endpoints.")
 
     # --- Process Cypher Files ---
-    all_cypher_files = node_cypher_files + edge_cypher_files
+    # All node files must be imported before any edge file, since edges MATCH their endpoints by id.
+    # Within each phase, files are independent and are imported concurrently.
     import_errors = False
     processed_files = 0 # Initialize counter
 
-    for cypher_file_path in all_cypher_files:
-        logging.info(f"\n--- Processing Cypher File: {cypher_file_path.name} ---")
-        try:
-            # 1. Read Cypher Query
-            cypher_content = cypher_file_path.read_text(encoding='utf-8')
-            if not cypher_content.strip():
-                logging.warning(f"Cypher file is empty, skipping: {cypher_file_path.name}")
-                continue
-
-            # 2. Find LOAD CSV and derive data file path
-            match = pattern_load_csv.search(cypher_content[0:-1])
-            if not match:
-                logging.error(f"Could not find 'LOAD CSV FROM 'file:/...'' pattern in {cypher_file_path.name}. Cannot modify for import. Skipping file.")
-                logging.error("Expected format: LOAD CSV FROM 'file:/<filename>_data.csv' AS <variable>")
-                import_errors = True
-                continue
-
-            load_clause_prefix = match.group(1) # "LOAD CSV..."
-            relative_data_filename = match.group(2) # "<filename>_data.csv"
-            load_clause_suffix = match.group(3) # " AS <variable>"
-            variable_name = match.group(4) # "<variable>" (e.g., 'line')
-
-            # Construct absolute path for the corresponding _data.csv file
-            # Ensure the data file is looked for in the same directory as the cypher file
-            data_file_path = cypher_file_path.parent.resolve() / Path(relative_data_filename).name
-            if not data_file_path.is_file():
-                logging.error(f"Corresponding data file not found for {cypher_file_path.name}: {data_file_path}")
-                logging.error("Ensure the '_data.csv' file exists in the same directory as the '_cypher.csv' file.")
-                import_errors = True
-                continue
-
-            # Convert to relative file:/// URI (Neo4j resolves against its import dir)
-            data_file_abs_uri = f"file:///{data_file_path.name}"
-            logging.info(f"Data file URI for Neo4j (relative): {data_file_abs_uri}")
-
-            # 3. Modify Cypher: Replace relative path with absolute URI
-            modified_cypher = pattern_load_csv.sub(
-                rf"{load_clause_prefix}'{data_file_abs_uri}'{load_clause_suffix}",
-                cypher_content,
-                count=1 # Replace only the first occurrence
-            )
-
-            # 4. Modify Cypher: Wrap core logic in CALL {} IN TRANSACTIONS
-            # Need to re-search in the *modified* string to get correct indices
-            match_modified = pattern_load_csv.search(modified_cypher)
-            if not match_modified:
-                logging.error(f"Internal error: Could not re-match LOAD CSV pattern in modified query for {cypher_file_path.name}. Skipping.")
-                import_errors = True
-                continue
-
-            load_clause_end_index = match_modified.end(0)
-            load_clause_full = modified_cypher[:load_clause_end_index]
-            core_logic = modified_cypher[load_clause_end_index:].strip()
-
-            if not core_logic:
-                logging.warning(f"No core Cypher logic found after LOAD CSV clause in {cypher_file_path.name}. Skipping execution.")
-                continue
-
-            # Construct the final batched query
-            batched_cypher = (
-                f"{load_clause_full}\n"
-                f"CALL {{\n"
-                f"    WITH {variable_name}\n"
-                # Indent core logic for readability (optional)
-                f"    {core_logic[0:-1].replace(chr(10), chr(10) + '    ')}\n"
-                f"}} IN TRANSACTIONS OF {BATCH_SIZE} ROWS\n"
-                # Add a final return for better feedback, though consume() is used
-                f"RETURN 'Batch processed from {cypher_file_path.name}'"
-            )
-
-            # log.debug(f"Modified Cypher for {cypher_file_path.name}:\n{batched_cypher}") # Uncomment for debugging
-
-            # 5. Execute Modified Cypher using session.run() for implicit transaction
-            with driver.session(database=database_name) as session:
-                try:
-                    logging.info(f"Executing modified Cypher from: {cypher_file_path.name}")
-                    # Use run().consume() directly for implicit transaction suitable for CALL {} IN TRANSACTIONS
-                    summary = session.run(batched_cypher).consume()
-                    logging.info(f"Successfully executed batch from {cypher_file_path.name}. Counters: {summary.counters}")
-                    processed_files += 1 # Increment counter ONLY on success
-                except neo4j_exceptions.ClientError as e:
-                    # Re-raise ClientError to be caught and handled by the outer loop's specific logging
-                    raise e
-                except Exception as e:
-                    # Re-raise other unexpected errors to be caught and handled by the outer loop's generic logging
-                    raise e
-
-        except FileNotFoundError:
-            logging.error(f"Cypher file not found during processing loop: {cypher_file_path}. This should not happen if discovery worked.")
-            import_errors = True
-        except neo4j_exceptions.ClientError as e:
-            logging.error(f"Neo4j ClientError during import of {cypher_file_path.name}: {e.code} - {e.message}")
-            if "constraint" in str(e.message).lower():
-                logging.error("Hint: Check for data violating uniqueness constraints.")
-            elif "apoc" in str(e.message).lower():
-                logging.error("Hint: Ensure APOC plugin is installed and configured in Neo4j if the Cypher query uses APOC procedures.")
-            elif "file access" in str(e.message).lower() or "couldn't load file" in str(e.message).lower() or "directory not configured" in str(e.message).lower():
-                logging.error(f"Hint: Neo4j server likely cannot access the data file URI: {data_file_abs_uri}")
-                logging.error(f"Hint: Verify Neo4j's 'dbms.directories.import' setting and file system permissions for the Neo4j process.")
-            elif "transaction" in str(e.message).lower():
-                logging.error("Hint: The error occurred during transaction processing, potentially related to batching or query complexity.")
-            import_errors = True
-        except Exception as e:
-            logging.error(f"An unexpected error occurred processing {cypher_file_path.name}: {type(e).__name__} - {e}")
-            import_errors = True
+    # Each phase's sessions start from the previous step's bookmarks, so edge sessions observe every node write.
+    for phase_name, phase_files in (("node", node_cypher_files), ("edge", edge_cypher_files)):
+        if not phase_files:
+            continue
+        if phase_name == "edge" and import_errors:
+            # Edges whose endpoints failed to import would silently match nothing, yet still be
+            # recorded with an import marker and skipped on the next run. Leave them for a re-run.
+            logging.error(f"Skipping {len(phase_files)} edge cypher files because node files failed to import. Fix the node errors and re-run.")
+            break
+        logging.info(f"Importing {len(phase_files)} {phase_name} cypher files with {workers} workers...")
+        phase_processed, phase_errors, bookmarks = run_import_phase(
+            driver, database_name, phase_files, workers, max_retries, bookmarks, prepared_queries, force, batch_size
+        )
+        processed_files += phase_processed
+        import_errors = import_errors or phase_errors
 
     logging.info(f"\nNeo4j import process finished for database '{database_name}'.")
     logging.info(f"Processed {processed_files} cypher files.")
@@ -297,6 +773,38 @@ def import_online_neo4j(
         return True
 # --- Main Execution ---
 
+def validate_args(args) -> bool:
+    """
+    Validates the parsed command-line arguments, logging every problem found.
+
+    Args:
+        args: The argparse namespace (with the password already resolved from the environment).
+
+    Returns:
+        True if all arguments are valid, False otherwise.
+    """
+    valid = True
+    input_path = Path(args.input_path)
+    if not input_path.exists():
+        logging.error(f"Input path not found: {args.input_path}")
+        valid = False
+    elif not (input_path.is_dir() or input_path.is_file()):
+        logging.error(f"Input path is not a valid file or directory: {args.input_path}")
+        valid = False
+    if not args.neo4j_password:
+        logging.error("Neo4j password is required. Set --neo4j-password or NEO4J_PASSWORD environment variable.")
+        valid = False
+    if args.batch_size < 1:
+        logging.error(f"--batch-size must be at least 1 (got {args.batch_size}).")
+        valid = False
+    if args.workers < 1:
+        logging.error(f"--workers must be at least 1 (got {args.workers}).")
+        valid = False
+    if args.max_retries < 0:
+        logging.error(f"--max-retries cannot be negative (got {args.max_retries}).")
+        valid = False
+    return valid
+
 def main():
     parser = argparse.ArgumentParser(
         description="Automate Joern CPG generation and Neo4j online import.",
@@ -317,30 +825,24 @@ def main():
                             help="Neo4j password. If not provided, reads from NEO4J_PASSWORD env var.")
     parser.add_argument("--neo4j-database", default=os.getenv("NEO4J_DATABASE", "neo4j"),
                             help="Target Neo4j database name. Reads from NEO4J_DATABASE env var if set.")
-    parser.add_argument("--neo4j-import-dir", default=os.getenv("NEO4J_IMPORT_DIR", "joern_neo4j_import"),
-                            help="Directory to store intermediate CPG and CSV files. Within the Neo4j import directory")
+
+    # Import tuning
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Number of data rows sent per UNWIND write transaction.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Number of cypher files imported concurrently (one Neo4j session per worker).")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Maximum retries per batch on transient Neo4j errors (e.g. deadlocks).")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-import every file, even if its import marker shows it is unchanged.")
 
     # Set password from environment variable if not provided via argument
     args = parser.parse_args()
     if not args.neo4j_password:
         args.neo4j_password = os.getenv("NEO4J_PASSWORD")
-        if not args.neo4j_password:
-            logging.error("Neo4j password is required. Set --neo4j-password or NEO4J_PASSWORD environment variable.")
-            sys.exit(1)
-
 
     # --- Validate Arguments ---
-    if not os.path.exists(args.input_path):
-        logging.error(f"Input path not found: {args.input_path}")
-        sys.exit(1)
-    if not os.path.isdir(args.input_path) and not os.path.isfile(args.input_path):
-        logging.error(f"Input path is not a valid file or directory: {args.input_path}")
-        sys.exit(1)
-    if not args.neo4j_password:
-        logging.error("Neo4j password is required. Set --neo4j-password or NEO4J_PASSWORD environment variable.")
-        sys.exit(1)
-    if not args.neo4j_url:
-        logging.error("Neo4j URL is required. Set --neo4j-url or NEO4J_URL environment variable.")
+    if not validate_args(args):
         sys.exit(1)
 
     # --- Define Paths ---
@@ -352,11 +854,6 @@ def main():
     csv_export_dir = os.path.join(abs_output_dir, "neo4j_csv")
     output_dir_path = Path(csv_export_dir).resolve() # Use resolved absolute path
 
-    # Define the Neo4j import directory (adjust if your setup differs)
-    # This path is specific to Neo4j Desktop on macOS for a particular DB instance
-    # NEO4J_IMPORT_DIR = Path("/Users/tenhitokiri/Library/Application Support/Neo4j Desktop/Application/relate-data/dbmss/dbms-208c6b9e-421f-40a0-90c1-d54f6b80a942/import")
-    NEO4J_IMPORT_DIR = Path(args.neo4j_import_dir).resolve()
-
     # --- Step 1: Run Joern Parse ---
     cpg_path = run_joern_parse(args.input_path, cpg_file_path, args.jvm_mem)
     if not cpg_path:
@@ -378,28 +875,6 @@ def main():
         logging.error("Exiting due to Joern export failure.")
         sys.exit(1)
 
-    # --- Step 2.5: Copy Data Files to Neo4j Import Directory ---
-    try:
-        logging.info(f"Ensuring Neo4j import directory exists: {NEO4J_IMPORT_DIR}")
-        NEO4J_IMPORT_DIR.mkdir(parents=True, exist_ok=True)
-
-        logging.info(f"Copying *_data.csv files from {output_dir_path} to {NEO4J_IMPORT_DIR}...")
-        copied_count = 0
-        for data_file in output_dir_path.glob("*_data.csv"):
-            if data_file.is_file():
-                try:
-                    shutil.copy(data_file, NEO4J_IMPORT_DIR)
-                    copied_count += 1
-                    # logging.debug(f"Copied {data_file.name}") # Uncomment for verbose logging
-                except Exception as copy_err:
-                    logging.error(f"Failed to copy {data_file.name} to {NEO4J_IMPORT_DIR}: {copy_err}")
-        logging.info(f"Finished copying {copied_count} data files.")
-
-    except Exception as e:
-        logging.error(f"Error during data file copying process: {e}")
-        sys.exit(1)
-
-
     # --- Step 3: Import to Neo4j ---
     logging.info(f"Starting Joern Neo4j import process...")
     logging.info(f"Looking for Cypher/Data files in: {output_dir_path}")
@@ -408,6 +883,7 @@ def main():
     logging.info(f"Target Neo4j Database: {args.neo4j_database}")
 
     driver = None
+    cypher_pool = None
     import_successful = False
     try:
         # --- Discover Files ---
@@ -417,9 +893,28 @@ def main():
             logging.info("No Cypher files found to process. Exiting.")
             sys.exit(0) # Exit successfully if no files found
 
+        # --- Prepare Queries ---
+        # Parse and transform all cypher files in worker processes while the driver connects
+        # (the files are small, so never start more processes than there are files)
+        cypher_files = node_cypher_files + edge_cypher_files
+        cypher_pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(cypher_files)))
+        prepared_queries = {
+            cypher_file_path: cypher_pool.submit(prepare_cypher_file, cypher_file_path)
+            for cypher_file_path in cypher_files
+        }
+
         # --- Connect to Neo4j ---
         logging.info("Connecting to Neo4j...")
-        driver = GraphDatabase.driver(args.neo4j_uri, auth=(args.neo4j_user, args.neo4j_password))
+        driver = GraphDatabase.driver(
+            args.neo4j_uri,
+            auth=(args.neo4j_user, args.neo4j_password),
+            # execute_write retries transient errors (e.g. deadlocks) for up to this many seconds
+            max_transaction_retry_time=MAX_TRANSACTION_RETRY_TIME_SECONDS,
+            # Every worker holds a connection for the whole phase; leave headroom for the driver
+            max_connection_pool_size=max(16, 2 * args.workers),
+            connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT_SECONDS,
+            keep_alive=True
+        )
         # Verify connectivity against the target database
         with driver.session(database=args.neo4j_database) as session:
             session.run("RETURN 1")
@@ -427,7 +922,9 @@ def main():
 
         # --- Run Import ---
         import_successful = import_online_neo4j(
-            driver, args.neo4j_database, node_cypher_files, edge_cypher_files, output_dir_path
+            driver, args.neo4j_database, node_cypher_files, edge_cypher_files, output_dir_path,
+            workers=args.workers, max_retries=args.max_retries, prepared_queries=prepared_queries,
+            force=args.force, batch_size=args.batch_size
         )
 
     except FileNotFoundError as e:
@@ -441,9 +938,10 @@ def main():
         logging.error("This might indicate an issue connecting to the specified database if it doesn't exist or is unavailable.")
     except Exception as e:
         logging.error(f"An unexpected error occurred: {type(e).__name__} - {e}")
-        import traceback
         logging.error(traceback.format_exc()) # log full traceback for unexpected errors
     finally:
+        if cypher_pool:
+            cypher_pool.shutdown(cancel_futures=True)
         if driver:
             logging.info("Closing Neo4j connection.")
             driver.close()
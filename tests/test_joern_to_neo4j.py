@@ -0,0 +1,25 @@
+import pytest
+
+import joern_to_neo4j
+
+
+def test_csv_reader_accepts_fields_larger_than_default_limit(tmp_path):
+    # CONFIG_FILE.CONTENT holds whole files (e.g. a package-lock.json)
+    content = "x" * 300_000
+    data_file = tmp_path / "nodes_CONFIG_FILE_data.csv"
+    data_file.write_text(f'1,CONFIG_FILE,"{content}",package-lock.json\n', encoding="utf-8")
+
+    batches = list(joern_to_neo4j._read_data_batches_csv(data_file, 10, False))
+
+    assert batches == [[["1", "CONFIG_FILE", content, "package-lock.json"]]]
+
+
+@pytest.mark.skipif(joern_to_neo4j.pacsv is None, reason="pyarrow is not installed")
+def test_arrow_reader_accepts_fields_larger_than_default_limit(tmp_path):
+    content = "x" * 300_000
+    data_file = tmp_path / "nodes_CONFIG_FILE_data.csv"
+    data_file.write_text(f'1,CONFIG_FILE,"{content}",\n', encoding="utf-8")
+
+    batches = list(joern_to_neo4j._read_data_batches_arrow(data_file, 10, False))
+
+    assert batches == [[["1", "CONFIG_FILE", content, None]]]